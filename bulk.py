@@ -0,0 +1,364 @@
+"""
+Bulk evaluation of externally supplied jack designs.
+
+Reads a CSV or Parquet file of designs in chunks, evaluates every chunk
+with the vectorized model.evaluate() and writes the inputs plus the safety
+factors, weight, cost and feasibility to a CSV or Parquet file. Reading,
+evaluating and writing run in separate threads connected by small queues,
+so the next chunk is being read and the previous one written while the
+current one is evaluated.
+
+Input columns:
+- length_diagonal, cross_section_height, cross_section_width,
+  material_thickness, crossbar_diameter, hole_offset (inches)
+- material: a name from material_dict (case and extra spaces ignored)
+- start_height, height_lifted (inches) and force (lbs) are optional and
+  default to the constants in model.py
+
+usage: python bulk.py designs.parquet results.parquet [--chunk-size N]
+"""
+
+import argparse
+import queue
+import threading
+
+import pandas as pd
+from numpy import asarray, errstate, float64, isfinite, nan, ones, where
+
+from model import (
+    FORCE,
+    HEIGHT_LIFTED,
+    STARTING_HEIGHT,
+    evaluate,
+    evaluate_buckling,
+    is_safe,
+    is_valid_geometry,
+    material_names,
+)
+
+GEOMETRY_COLUMNS = (
+    "length_diagonal",
+    "cross_section_height",
+    "cross_section_width",
+    "material_thickness",
+    "crossbar_diameter",
+    "hole_offset",
+)
+OPTIONAL_COLUMNS = {  # column -> default value
+    "start_height": STARTING_HEIGHT,  # inches
+    "height_lifted": HEIGHT_LIFTED,  # inches
+    "force": FORCE,  # lbs
+}
+OUTPUT_COLUMNS = (
+    "n_buckling",
+    "n_tensile",
+    "n_tearout",
+    "n_bearing",
+    "n_axial",
+    "weight",
+    "cost",
+)
+
+DEFAULT_CHUNK_SIZE = 100_000  # rows
+QUEUE_SIZE = 2  # chunks buffered between the reader, evaluator and writer
+
+
+def _material_key(name: str) -> str:
+    return " ".join(str(name).split()).lower()
+
+
+material_index = {_material_key(name): i for i, name in enumerate(material_names)}
+
+
+def file_format(path: str) -> str:
+    """
+    Returns "csv" or "parquet" from the file extension.
+    """
+    lower = path.lower()
+    if lower.endswith((".parquet", ".pq")):
+        return "parquet"
+    if lower.endswith((".csv", ".csv.gz", ".csv.bz2", ".csv.zip", ".csv.xz")):
+        return "csv"
+    raise ValueError(f"can't tell the file format of {path!r}, expected .csv or .parquet")
+
+
+def read_chunks(path: str, chunk_size: int = DEFAULT_CHUNK_SIZE):
+    """
+    Yields the input file as DataFrames of at most chunk_size rows.
+    """
+    if file_format(path) == "csv":
+        yield from pd.read_csv(path, chunksize=chunk_size)
+    else:
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+
+
+def validate(
+    chunk: pd.DataFrame,
+    first_row: int = 0,
+    on_error: str = "raise",
+) -> tuple[dict, object, object]:
+    """
+    Converts one chunk into arrays for model.evaluate().
+
+    Parameters
+    ----------
+    chunk : DataFrame
+        Rows read from the input file.
+    first_row : int
+        Row number of the first row in the file, for error messages.
+    on_error : str
+        "raise" to stop at the first invalid row, or "mark" to keep going
+        and give invalid rows nan outputs and valid = False.
+
+    Returns
+    -------
+    tuple
+        - Column name -> float array, for the geometry and optional columns
+        - Array of material indices into material_names (0 where invalid)
+        - Bool array, True where the row is valid
+    """
+    missing = [c for c in GEOMETRY_COLUMNS + ("material",) if c not in chunk.columns]
+    if missing:
+        raise ValueError(f"input is missing the column(s) {', '.join(missing)}")
+
+    values = {}
+    valid = ones(len(chunk), dtype=bool)
+    for name in GEOMETRY_COLUMNS:
+        values[name] = pd.to_numeric(chunk[name], errors="coerce").to_numpy(float64)
+        valid &= isfinite(values[name]) & (values[name] > 0)
+    for name, default in OPTIONAL_COLUMNS.items():
+        if name in chunk.columns:
+            values[name] = pd.to_numeric(chunk[name], errors="coerce").to_numpy(float64)
+            valid &= isfinite(values[name]) & (values[name] > 0)
+        else:
+            values[name] = default
+
+    # look up each distinct name once rather than once per row
+    codes, names = pd.factorize(chunk["material"], use_na_sentinel=False)
+    lookup = asarray([material_index.get(_material_key(m), -1) for m in names], dtype=int)
+    material = lookup[codes] if len(codes) else codes
+    valid &= material >= 0
+
+    if on_error == "raise" and not valid.all():
+        bad = where(~valid)[0][:5]
+        rows = ", ".join(str(first_row + i) for i in bad)
+        raise ValueError(
+            f"invalid design(s) at row(s) {rows}: inputs must be positive numbers "
+            f"and material one of {material_names}"
+        )
+
+    return values, where(valid, material, 0), valid
+
+
+def evaluate_chunk(chunk: pd.DataFrame, first_row: int = 0, on_error: str = "raise") -> pd.DataFrame:
+    """
+    Evaluates one chunk of designs and returns it with the model outputs,
+    a feasible column and, with on_error="mark", a valid column added.
+    """
+    values, material, valid = validate(chunk, first_row, on_error)
+    geometry = [values[name] for name in GEOMETRY_COLUMNS]
+    with errstate(invalid="ignore", divide="ignore"):  # impossible geometries give nan
+        outputs = evaluate(*geometry, values["start_height"], material, force=values["force"])
+        buckling = evaluate_buckling(
+            values["length_diagonal"],
+            values["cross_section_height"],
+            values["cross_section_width"],
+            values["material_thickness"],
+            values["hole_offset"],
+            values["start_height"],
+            material,
+            force=values["force"],
+        )
+        feasible = is_safe(*buckling, *outputs[1:5]) & is_valid_geometry(
+            *geometry, values["start_height"], values["height_lifted"]
+        )
+
+    # write back the coerced inputs, so every chunk has the same column types
+    # whatever read_csv guessed for it
+    result = chunk.copy()
+    for name in GEOMETRY_COLUMNS + tuple(OPTIONAL_COLUMNS):
+        if name in chunk.columns:
+            result[name] = values[name]
+    result["material"] = chunk["material"].astype("string")
+    for name, output in zip(OUTPUT_COLUMNS, outputs):
+        result[name] = where(valid, output, nan)
+    result["feasible"] = feasible & valid
+    if on_error == "mark":
+        result["valid"] = valid
+    return result
+
+
+class _Writer:
+    """
+    Appends result chunks to a CSV or Parquet file.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.format = file_format(path)
+        self.writer = None
+        self.schema = None
+
+    def write(self, chunk: pd.DataFrame) -> None:
+        import pyarrow as pa
+
+        table = pa.Table.from_pandas(chunk, preserve_index=False)
+        if self.writer is None:
+            # known columns get their declared type, only extra pass-through
+            # columns keep the type inferred from the first chunk
+            declared = {
+                **{name: pa.float64() for name in GEOMETRY_COLUMNS + tuple(OPTIONAL_COLUMNS) + OUTPUT_COLUMNS},
+                "material": pa.string(),
+                "feasible": pa.bool_(),
+                "valid": pa.bool_(),
+            }
+            self.schema = pa.schema(
+                [pa.field(f.name, declared.get(f.name, f.type)) for f in table.schema]
+            )
+            if self.format == "csv":
+                import pyarrow.csv as pacsv
+
+                self.writer = pacsv.CSVWriter(self.path, self.schema)
+            else:
+                import pyarrow.parquet as pq
+
+                self.writer = pq.ParquetWriter(self.path, self.schema)
+        self.writer.write_table(table.select(self.schema.names).cast(self.schema))
+
+    def close(self) -> None:
+        if self.writer is not None:
+            self.writer.close()
+
+
+_DONE = object()  # queue sentinel
+
+
+def _run_stage(target, errors: list):
+    # Runs one pipeline stage, keeping its exception for the main thread
+    def run():
+        try:
+            target()
+        except BaseException as e:  # noqa: BLE001 - re-raised by evaluate_file
+            errors.append(e)
+
+    return threading.Thread(target=run, daemon=True)
+
+
+def _put(q: queue.Queue, item, stop: threading.Event) -> bool:
+    # Blocks until there is room in q, giving up if another stage failed
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            pass
+    return False
+
+
+def _get(q: queue.Queue, stop: threading.Event):
+    while not stop.is_set():
+        try:
+            return q.get(timeout=0.1)
+        except queue.Empty:
+            pass
+    return _DONE
+
+
+def evaluate_file(
+    input_path: str,
+    output_path: str,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    on_error: str = "raise",
+) -> int:
+    """
+    Evaluates every design in a CSV or Parquet file.
+
+    Parameters
+    ----------
+    input_path : str
+        CSV or Parquet file of designs, see the module docstring for the
+        columns.
+    output_path : str
+        CSV or Parquet file to write. It gets every input column plus the
+        model outputs and feasible (and valid, with on_error="mark").
+    chunk_size : int
+        Rows read, evaluated and written at a time.
+    on_error : str
+        "raise" or "mark", see validate().
+
+    Returns
+    -------
+    int
+        Number of rows evaluated.
+    """
+    if on_error not in ("raise", "mark"):
+        raise ValueError(f'on_error must be "raise" or "mark", not {on_error!r}')
+    file_format(output_path)  # fail before reading anything
+
+    to_evaluate = queue.Queue(maxsize=QUEUE_SIZE)
+    to_write = queue.Queue(maxsize=QUEUE_SIZE)
+    stop = threading.Event()
+    errors = []
+    rows = [0]
+
+    def read():
+        try:
+            for chunk in read_chunks(input_path, chunk_size):
+                if not _put(to_evaluate, chunk, stop):
+                    return
+        finally:
+            _put(to_evaluate, _DONE, stop)
+
+    def compute():
+        try:
+            while (chunk := _get(to_evaluate, stop)) is not _DONE:
+                result = evaluate_chunk(chunk, rows[0], on_error)
+                rows[0] += len(chunk)
+                if not _put(to_write, result, stop):
+                    return
+        finally:
+            _put(to_write, _DONE, stop)
+
+    def write():
+        writer = _Writer(output_path)
+        try:
+            while (chunk := _get(to_write, stop)) is not _DONE:
+                writer.write(chunk)
+        finally:
+            writer.close()
+
+    threads = [_run_stage(stage, errors) for stage in (read, compute, write)]
+    for thread in threads:
+        thread.start()
+    while any(thread.is_alive() for thread in threads):
+        for thread in threads:
+            thread.join(timeout=0.1)
+        if errors:
+            stop.set()
+    if errors:
+        raise errors[0]
+    return rows[0]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Evaluate a file of jack designs.")
+    parser.add_argument("input", help="CSV or Parquet file of designs")
+    parser.add_argument("output", help="CSV or Parquet file to write")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument(
+        "--mark-invalid",
+        action="store_true",
+        help="mark invalid rows instead of stopping at the first one",
+    )
+    args = parser.parse_args()
+
+    n = evaluate_file(
+        args.input,
+        args.output,
+        chunk_size=args.chunk_size,
+        on_error="mark" if args.mark_invalid else "raise",
+    )
+    print(f"Evaluated {n} designs")
@@ -0,0 +1,260 @@
+"""
+Incremental evaluation of the jack model.
+
+The model is written as a small dependency graph: every intermediate value
+(start angle, forces, section moments, volumes, ...) is a node that caches
+its result and only recomputes after one of its inputs changed. Changing
+the material therefore leaves every geometry-only node alone, and changing
+the load leaves the section properties and volumes alone. The nodes call
+the same model.py helpers as model.evaluate(), so both give the same
+numbers.
+"""
+
+from numpy import arcsin, broadcast_to, degrees, minimum
+
+from model import (
+    CROSSBAR_MATERIAL,
+    FORCE,
+    HOLE_DIAMETER,
+    STARTING_HEIGHT,
+    calc_bearing_stress,
+    calc_buckling_safety_factor,
+    calc_crossbar_force,
+    calc_crossbar_mass,
+    calc_crossbar_volume,
+    calc_diagonal_axial_stress,
+    calc_diagonal_force,
+    calc_diagonal_mass,
+    calc_diagonal_volume,
+    calc_length_crossbar,
+    calc_mass_cost,
+    calc_moments_of_inertia,
+    calc_tearout_stress,
+    calc_tensile_safety_factor,
+    calc_yield_safety_factor,
+    material_dict,
+    material_property,
+)
+
+
+class Graph:
+    """
+    A set of cached nodes. Inputs are set with set(), every other node is
+    computed on demand by get() and kept until one of its dependencies
+    changes.
+    """
+
+    def __init__(self):
+        self.funs = {}  # node name -> function of the dependency values
+        self.deps = {}  # node name -> names of the nodes it reads
+        self.dependents = {}  # node name -> names of the nodes that read it
+        self.values = {}  # node name -> cached value
+        self.calls = {}  # node name -> number of times it was computed
+
+    def input(self, name: str) -> None:
+        self.funs[name] = None
+        self.deps[name] = ()
+        self.dependents.setdefault(name, [])
+
+    def node(self, name: str, deps: tuple, fun) -> None:
+        self.funs[name] = fun
+        self.deps[name] = tuple(deps)
+        self.dependents.setdefault(name, [])
+        self.calls[name] = 0
+        for dep in deps:
+            self.dependents[dep].append(name)
+
+    def set(self, **inputs) -> None:
+        """
+        Sets input values, dropping the cached value of every node that
+        depends on an input that actually changed.
+        """
+        for name, value in inputs.items():
+            if self.funs[name] is not None:
+                raise ValueError(f"{name} is a computed node, not an input")
+            if name in self.values and _same(self.values[name], value):
+                continue
+            self.values[name] = value
+            self.invalidate(name)
+
+    def invalidate(self, name: str) -> None:
+        stack = list(self.dependents[name])
+        while stack:
+            dependent = stack.pop()
+            if self.values.pop(dependent, _MISSING) is not _MISSING:
+                stack.extend(self.dependents[dependent])
+
+    def get(self, name: str):
+        if name not in self.values:
+            if self.funs[name] is None:
+                raise KeyError(f"input {name} has not been set")
+            args = [self.get(dep) for dep in self.deps[name]]
+            self.values[name] = self.funs[name](*args)
+            self.calls[name] += 1
+        return self.values[name]
+
+
+_MISSING = object()
+
+
+def _same(old, new) -> bool:
+    if old is new:
+        return True
+    try:
+        return bool(old == new)
+    except ValueError:  # numpy arrays, compare elementwise
+        return False
+
+
+JACK_INPUTS = (
+    "length_diagonal",
+    "cross_section_height",
+    "cross_section_width",
+    "material_thickness",
+    "crossbar_diameter",
+    "hole_offset",
+    "start_height",
+    "material",
+    "force",
+)
+JACK_OUTPUTS = (
+    "n_buckling",
+    "n_tensile",
+    "n_tearout",
+    "n_bearing",
+    "n_axial",
+    "weight",
+    "cost",
+)
+
+
+def jack_graph() -> Graph:
+    """
+    Builds the model() calculation as a Graph.
+
+    Inputs are named like the arguments of model(), plus force (lbs). The
+    outputs are the JACK_OUTPUTS nodes, which match what model() returns.
+    """
+    g = Graph()
+    for name in JACK_INPUTS:
+        g.input(name)
+    g.set(force=FORCE, start_height=STARTING_HEIGHT)
+
+    # Geometry only
+    g.node(
+        "length_pins",  # length of the diagonal between the two pins
+        ("length_diagonal", "hole_offset"),
+        lambda l_d, de: l_d - 2 * de,
+    )
+    g.node(
+        "start_angle",
+        ("start_height", "length_pins"),
+        lambda h0, l: degrees(arcsin(h0 / 2 / l)),
+    )
+    g.node("length_cb", ("length_diagonal", "start_height"), calc_length_crossbar)
+    g.node(
+        "min_I",
+        ("cross_section_height", "cross_section_width", "material_thickness"),
+        lambda h, w, t: minimum(*calc_moments_of_inertia(h, w, t)),
+    )
+    g.node(
+        "volume_d",
+        ("length_diagonal", "cross_section_height", "cross_section_width", "material_thickness"),
+        lambda l_d, h, w, t: calc_diagonal_volume(l_d, h, w, t, HOLE_DIAMETER),
+    )
+    g.node("volume_cb", ("crossbar_diameter", "length_cb"), calc_crossbar_volume)
+    # the crossbar is always steel, so its mass does not depend on the material
+    g.node(
+        "mass_cb",
+        ("volume_cb",),
+        lambda v: calc_crossbar_mass(v, material_dict[CROSSBAR_MATERIAL]["density"]),
+    )
+
+    # Load
+    g.node("F_d", ("force", "start_angle"), calc_diagonal_force)
+    g.node("F_cb", ("force", "start_angle"), calc_crossbar_force)
+    g.node(
+        "sigma_tearout",
+        ("hole_offset", "material_thickness", "F_d"),
+        calc_tearout_stress,
+    )
+    g.node(
+        "sigma_bearing",
+        ("material_thickness", "F_d"),
+        lambda t, F_d: calc_bearing_stress(HOLE_DIAMETER, t, F_d),
+    )
+    g.node(
+        "sigma_axial",
+        ("material_thickness", "cross_section_height", "F_d"),
+        lambda t, h, F_d: calc_diagonal_axial_stress(HOLE_DIAMETER, t, h, F_d),
+    )
+    g.node("n_tensile", ("F_cb", "crossbar_diameter"), calc_tensile_safety_factor)
+
+    # Material
+    for name, key in (("E", "E"), ("S_y", "S_y"), ("density", "density"), ("cost_per_lb", "cost")):
+        g.node(name, ("material",), lambda m, key=key: material_property(m, key))
+    g.node(
+        "n_buckling",
+        ("E", "min_I", "length_pins", "F_d"),
+        calc_buckling_safety_factor,
+    )
+    g.node("n_tearout", ("S_y", "sigma_tearout"), calc_yield_safety_factor)
+    g.node("n_bearing", ("S_y", "sigma_bearing"), calc_yield_safety_factor)
+    g.node("n_axial", ("S_y", "sigma_axial"), calc_yield_safety_factor)
+    g.node("mass_d", ("volume_d", "density"), calc_diagonal_mass)
+    g.node("weight", ("mass_d", "mass_cb"), lambda m_d, m_cb: m_d + m_cb)
+    g.node(
+        "cost",
+        ("mass_d", "mass_cb", "cost_per_lb"),
+        lambda m_d, m_cb, c: calc_mass_cost(m_d, m_cb, c, material_dict[CROSSBAR_MATERIAL]["cost"]),
+    )
+
+    return g
+
+
+def evaluate_catalog(
+    length_diagonal: float,  # inches
+    cross_section_height: float,  # inches
+    cross_section_width: float,  # inches
+    material_thickness: float,  # inches
+    crossbar_diameter: float,  # inches
+    hole_offset: float,  # inches
+    start_height: float,  # inches
+    materials: list[str] = None,
+    force: float = FORCE,  # lbs
+    graph: Graph = None,
+) -> dict:
+    """
+    Evaluates one geometry against a list of materials. The geometry and
+    load nodes are computed once (or reused from graph), and the material
+    nodes are computed once for the whole list as arrays.
+
+    Parameters
+    ----------
+    materials : list of str, optional
+        Materials from material_dict. Defaults to all of them.
+    graph : Graph, optional
+        A jack_graph() to reuse, e.g. across calls that share the geometry.
+        A new one is built if not given.
+
+    Returns
+    -------
+    dict
+        Output name (JACK_OUTPUTS, the values model() returns) -> read-only
+        array with one entry per material, in the order of materials.
+    """
+    materials = list(material_dict) if materials is None else materials
+    graph = jack_graph() if graph is None else graph
+    graph.set(
+        length_diagonal=length_diagonal,
+        cross_section_height=cross_section_height,
+        cross_section_width=cross_section_width,
+        material_thickness=material_thickness,
+        crossbar_diameter=crossbar_diameter,
+        hole_offset=hole_offset,
+        start_height=start_height,
+        force=force,
+    )
+
+    graph.set(material=tuple(materials))
+    return {name: broadcast_to(graph.get(name), len(materials)) for name in JACK_OUTPUTS}
@@ -1,6 +1,7 @@
 from model import *
 from scipy.optimize import minimize
-from numpy import sin, cos, tan, pi, degrees, arcsin
+from numpy import sin, cos, tan, pi, degrees, radians, arcsin, sqrt, inf, array
+from solvers import solve, solver_dict, is_feasible, pick_fastest_reliable, save_solver_choice, select_solver
 
 import warnings
 warnings.filterwarnings("ignore", category=RuntimeWarning)
@@ -113,7 +114,7 @@ def con1(x):  # n_buckling 1
 
     F_d = calc_diagonal_force(FORCE, start_angle)
     n_buckling = P_cr / F_d
-    return n_buckling - 10
+    return n_buckling - MIN_SAFETY_FACTORS["buckling_xx"]
 
 
 def con2(x):  # n_buckling 2
@@ -129,7 +130,7 @@ def con2(x):  # n_buckling 2
 
     F_d = calc_diagonal_force(FORCE, start_angle)
     n_buckling = P_cr / F_d
-    return n_buckling - 6
+    return n_buckling - MIN_SAFETY_FACTORS["buckling_yy"]
 
 
 def con3(x):  # n_tensile
@@ -138,7 +139,7 @@ def con3(x):  # n_tensile
     F_cb = calc_crossbar_force(FORCE, start_angle)
     n_tensile = S_y_cb / calc_crossbar_stress(F_cb, x[4])
 
-    return n_tensile - 4
+    return n_tensile - MIN_SAFETY_FACTORS["tensile"]
 
 
 def con4(x):  # n_tearout
@@ -147,7 +148,7 @@ def con4(x):  # n_tearout
     sigma_tearout = calc_tearout_stress(x[5], x[3], F_d)
     n_tearout = S_y / sigma_tearout
 
-    return n_tearout - 5
+    return n_tearout - MIN_SAFETY_FACTORS["tearout"]
 
 
 def con5(x):  # n_bearing
@@ -156,7 +157,7 @@ def con5(x):  # n_bearing
     sigma_bearing = calc_bearing_stress(HOLE_DIAMETER, x[3], F_d)
 
     n_bearing = S_y / sigma_bearing
-    return n_bearing - 4
+    return n_bearing - MIN_SAFETY_FACTORS["bearing"]
 
 
 def con6(x):  # n_axial
@@ -165,7 +166,7 @@ def con6(x):  # n_axial
     sigma_axial = calc_diagonal_axial_stress(HOLE_DIAMETER, x[3], x[1], F_d)
 
     n_axial = S_y / sigma_axial
-    return n_axial - 4
+    return n_axial - MIN_SAFETY_FACTORS["axial"]
 
 
 def con7(x): # diagonal long enough to reach height
@@ -217,44 +218,382 @@ bounds = [
 
 initial_guess = [10, 1, 1, 0.25, 1, 0.5]
 
-# result = minimize(
-#     obj,
-#     initial_guess,
-#     constraints=constraints,
-#     bounds=bounds,
-#     method="COBYQA",
-#     options={"disp": False, "adaptive": True, "maxiter": 10000, "maxfev": 10000, "initial_tr_radius": 0.01},
-# )
-
-# print("Optimization Success:", result.success)  # True if optimization succeeded
-# print("Optimal Value of x:", result.x)  # The value of x that minimizes the function
-# print("Minimum Function Value:", result.fun)  # The minimum function value
-# print("Exit Message:", result.message)
-
-results = []
-
-for i in material_dict.keys():  # material to be used for the jack
-    cost = material_dict[i]["cost"]  # $/lb
-    density = material_dict[i]["density"]  # lb/in^3
-    E = material_dict[i]["E"]  # psi
-    S_y = material_dict[i]["S_y"]  # psi
-    S_UT = material_dict[i]["S_UT"]  # psi
-
-    result = minimize(
-        obj,
-        initial_guess,
-        constraints=constraints,
-        bounds=bounds,
-        method="COBYQA",
-        options={"disp": False, "maxiter": 10000, "maxfev": 10000, "initial_tr_radius": 0.01},
+
+"""
+Pre-sizing: once x[0], x[1], x[2] and x[5] are fixed, the crossbar diameter
+x[4] and material thickness x[3] each have a closed-form minimum. The cost
+grows with both, so they are set to those minimums and the optimizer only
+searches the remaining variables.
+
+z[0]: length_diagonal (x[0])
+z[1]: cross_section_height (x[1])
+z[2]: cross_section_width (x[2])
+z[3]: hole_offset (x[5])
+"""
+
+PRESIZED_INDICES = [0, 1, 2, 5]  # x indices the pre-sized optimizer still searches
+
+
+def presize_crossbar_diameter(x) -> float:  # inches
+    """
+    Smallest crossbar diameter that satisfies con3. From
+    calc_crossbar_stress, with n = MIN_SAFETY_FACTORS["tensile"]:
+                  4⋅n⋅F_cb
+        d = sqrt(──────────)
+                   π⋅S_y
+    """
+    S_y_cb = material_dict["steel 1030 1000C"]["S_y"]
+    start_angle = degrees(arcsin((STARTING_HEIGHT / 2) / (x[0] - 2 * x[5])))
+    F_cb = calc_crossbar_force(FORCE, start_angle)
+    n = MIN_SAFETY_FACTORS["tensile"]
+    return max(sqrt(4 * n * F_cb / (pi * S_y_cb)), bounds[4][0])
+
+
+def presize_material_thickness(x) -> float:  # inches
+    """
+    Smallest material thickness that satisfies con5. From
+    calc_bearing_stress, with n = MIN_SAFETY_FACTORS["bearing"]:
+              n⋅F_d
+        t = ─────────
+            2⋅d_h⋅S_y
+    """
+    start_angle = degrees(arcsin((STARTING_HEIGHT / 2) / (x[0] - 2 * x[5])))
+    F_d = calc_diagonal_force(FORCE, start_angle)
+    n = MIN_SAFETY_FACTORS["bearing"]
+    return max(n * F_d / (2 * HOLE_DIAMETER * S_y), bounds[3][0])
+
+
+def presize(z) -> list[float]:
+    """
+    Expands a pre-sized design vector z into the full design vector x.
+    """
+    x = [z[0], z[1], z[2], 0.0, 0.0, z[3]]
+    x[3] = presize_material_thickness(x)
+    x[4] = presize_crossbar_diameter(x)
+    return x
+
+
+def presized_obj(z):
+    return obj(presize(z))
+
+
+# con3 and con5 hold by construction. Tearout and axial stress are left to
+# the optimizer: folding them into the thickness as a max() puts a kink in the
+# objective right at the optimum and slows the gradient-based backends down.
+presized_constraints = [
+    {"type": "ineq", "fun": lambda z, f=con: f(presize(z))}
+    for con in (con1, con2, con4, con6, con7, con8, con9, con10, con11)
+]
+
+# (FORCE, STARTING_HEIGHT, HEIGHT_LIFTED) load cases used to calibrate the solvers
+CALIBRATION_LOAD_CASES = [
+    (3000, 6.0, 6.0),
+    (2000, 4.0, 6.0),
+    (4000, 8.0, 4.0),
+]
+
+
+def use_material(name: str) -> None:
+    """
+    Sets the material the objective and constraints are evaluated with.
+    """
+    global material, cost, density, E, S_y, S_UT
+    material = name
+    cost = material_dict[name]["cost"]  # $/lb
+    density = material_dict[name]["density"]  # lb/in^3
+    E = material_dict[name]["E"]  # psi
+    S_y = material_dict[name]["S_y"]  # psi
+    S_UT = material_dict[name]["S_UT"]  # psi
+
+
+def use_load_case(
+    force: float,  # lbs
+    starting_height: float,  # inches
+    height_lifted: float,  # inches
+) -> None:
+    """
+    Sets the load case the objective and constraints are evaluated with.
+    """
+    global FORCE, STARTING_HEIGHT, HEIGHT_LIFTED
+    FORCE = force
+    STARTING_HEIGHT = starting_height
+    HEIGHT_LIFTED = height_lifted
+    bounds[0] = (STARTING_HEIGHT / 2, bounds[0][1])
+    # start with the pins far enough apart to reach the lifted height (con8)
+    initial_guess[0] = max(10, (STARTING_HEIGHT + HEIGHT_LIFTED) / 2 / sin(radians(80)) + 3)
+
+
+def optimize(backend: str = None, presized: bool = True):
+    """
+    Minimizes cost for the current material and load case.
+
+    Parameters
+    ----------
+    backend : str, optional
+        Name of the solver backend, referenced from solver_dict. Defaults to
+        the backend picked by the last tournament.
+    presized : bool
+        Whether to solve the pre-sized problem, where x[3] and x[4] are set
+        in closed form. The answer is always checked against the full
+        constraint set, and the full problem is solved if that check fails.
+
+    Returns
+    -------
+    OptimizeResult
+        See solvers.solve. result.x is always the full design vector.
+    """
+    if backend is None:
+        backend = select_solver()
+    if not presized:
+        return solve(backend, obj, initial_guess, constraints, bounds)
+
+    result = solve(
+        backend,
+        presized_obj,
+        [initial_guess[i] for i in PRESIZED_INDICES],
+        presized_constraints,
+        [bounds[i] for i in PRESIZED_INDICES],
     )
+    if result.feasible:
+        result.x = array(presize(result.x))
+        result.fun = obj(result.x)
+        result.feasible = is_feasible(result.x, constraints, bounds)
+    if not result.feasible:
+        nfev, wall_time = result.nfev, result.wall_time
+        result = solve(backend, obj, initial_guess, constraints, bounds)
+        result.nfev += nfev
+        result.wall_time += wall_time
+    return result
+
+
+def minimum_design(name: str) -> list[float]:
+    """
+    Smallest value every design variable can take in a feasible jack made
+    of the given material under the current load case. Each entry is a
+    separate minimum; together they are usually not a feasible design.
+
+    The diagonal force grows with the length between the pins, so it is
+    smallest at the shortest length con8 allows. That force sets the
+    thinnest wall bearing and tearout allow, which with the thinnest
+    crossbar con3 allows sets the smallest section con9 and con10 allow.
+    """
+    S_y_d = material_dict[name]["S_y"]
+    S_y_cb = material_dict["steel 1030 1000C"]["S_y"]
+
+    l_min = max(
+        (STARTING_HEIGHT + HEIGHT_LIFTED) / 2 / sin(radians(80)),  # con8
+        (STARTING_HEIGHT + HEIGHT_LIFTED) / 2,  # con7
+    )  # shortest length between the pins
+    start_angle = degrees(arcsin((STARTING_HEIGHT / 2) / l_min))
+    F_d = calc_diagonal_force(FORCE, start_angle)
+    F_cb = calc_crossbar_force(FORCE, start_angle)
 
-    results.append((i, result.fun, result.x))
+    n = MIN_SAFETY_FACTORS
+    crossbar_diameter = max(sqrt(4 * n["tensile"] * F_cb / (pi * S_y_cb)), bounds[4][0])  # con3
+    material_thickness = max(
+        n["bearing"] * F_d / (2 * HOLE_DIAMETER * S_y_d),  # con5
+        n["tearout"] * sqrt(3) * F_d / (4 * bounds[5][1] * S_y_d),  # con4
+        bounds[3][0],
+    )
+    cross_section = 2 * material_thickness + crossbar_diameter  # con9, con10
+
+    return [
+        max(l_min + 2 * bounds[5][0], bounds[0][0]),
+        max(cross_section, bounds[1][0]),
+        max(cross_section, bounds[2][0]),
+        material_thickness,
+        crossbar_diameter,
+        bounds[5][0],
+    ]
+
+
+def is_surely_infeasible(name: str) -> bool:
+    """
+    True when some variable of minimum_design() is already past its upper
+    bound, so no solve is needed to know the load case can't be met.
+    """
+    return any(x_i > high for x_i, (low, high) in zip(minimum_design(name), bounds))
+
+
+def cost_lower_bound(name: str) -> float:  # $
+    """
+    Cheap lower bound on the cost any feasible jack made of the given
+    material can reach under the current load case.
+
+    Cost grows with every variable inside the bounds, so the cost of
+    minimum_design() is a lower bound. It scales with density * $/lb / S_y,
+    so materials with a poor strength-to-weight ratio or a high price get a
+    high bound.
+    """
+    x = minimum_design(name)
+    return calc_cost(
+        x[0],
+        x[1],
+        x[2],
+        x[3],
+        HOLE_DIAMETER,
+        x[4],
+        calc_length_crossbar(x[0], STARTING_HEIGHT),
+        material_dict[name]["density"],
+        material_dict["steel 1030 1000C"]["density"],
+        material_dict[name]["cost"],
+        material_dict["steel 1030 1000C"]["cost"],
+    )
 
-print("Results:")
 
-for i in results:
-    print(f"Material: {i[0]}")
-    print(f"Minimum Cost: ${i[1]:.2f}")
-    print(f"Optimal x: {[round(val, 3) for val in i[2]]}")
-    print()
\ No newline at end of file
+def optimize_material(
+    materials: list[str] = None,
+    backend: str = None,
+) -> tuple[str, object, list[dict]]:
+    """
+    Finds the cheapest material and design in one branch-and-bound search.
+
+    Materials are visited in order of cost_lower_bound(). Each one is fully
+    optimized only while its bound is below the best cost found so far;
+    once a bound reaches that cost, it and every material after it are
+    skipped.
+
+    Parameters
+    ----------
+    materials : list of str, optional
+        Candidate materials. Defaults to every entry in material_dict.
+    backend : str, optional
+        Solver backend, see optimize().
+
+    Returns
+    -------
+    tuple
+        - Name of the cheapest material (None if nothing was feasible)
+        - Its OptimizeResult
+        - One record per material with its lower bound, its cost (None if
+          it was not solved) and its status: "solved", "infeasible" or
+          "pruned"
+    """
+    materials = list(material_dict) if materials is None else materials
+    previous_material = material
+
+    lower_bounds = {m: cost_lower_bound(m) for m in materials}
+    best_material, best_result = None, None
+    best_cost = inf
+    records = []
+
+    try:
+        for m in sorted(materials, key=lambda m: lower_bounds[m]):
+            record = {"material": m, "lower_bound": lower_bounds[m], "cost": None}
+            if lower_bounds[m] >= best_cost:
+                record["status"] = "pruned"
+            else:
+                use_material(m)
+                result = optimize(backend)
+                record["status"] = "solved" if result.feasible else "infeasible"
+                if result.feasible:
+                    record["cost"] = float(result.fun)
+                    if result.fun < best_cost:
+                        best_material, best_result, best_cost = m, result, result.fun
+            records.append(record)
+    finally:
+        use_material(previous_material)
+
+    return best_material, best_result, records
+
+
+def run_tournament(
+    materials: list[str] = None,
+    load_cases: list[tuple[float, float, float]] = None,
+    backends: list[str] = None,
+    save: bool = True,
+) -> tuple[str, list[dict]]:
+    """
+    Runs every solver backend on a calibration set and picks the fastest
+    reliable one.
+
+    Parameters
+    ----------
+    materials : list of str, optional
+        Materials to calibrate on. Defaults to every entry in material_dict.
+    load_cases : list of tuple, optional
+        (FORCE, STARTING_HEIGHT, HEIGHT_LIFTED) cases. Defaults to
+        CALIBRATION_LOAD_CASES. Materials is_surely_infeasible() rules out
+        for a case are not run on it.
+    backends : list of str, optional
+        Backends to compare. Defaults to every entry in solver_dict.
+    save : bool
+        Whether to store the winner so later runs of optimize() use it.
+
+    Returns
+    -------
+    tuple
+        - Name of the winning backend
+        - One record per (backend, material, load case) with nfev, wall
+          time, final cost and feasibility
+    """
+    materials = list(material_dict) if materials is None else materials
+    load_cases = CALIBRATION_LOAD_CASES if load_cases is None else load_cases
+    backends = list(solver_dict) if backends is None else backends
+
+    previous_material = material
+    previous_load_case = (FORCE, STARTING_HEIGHT, HEIGHT_LIFTED)
+
+    records = []
+    try:
+        for load_case in load_cases:
+            use_load_case(*load_case)
+            for m in materials:
+                if is_surely_infeasible(m):  # nothing for the backends to find
+                    continue
+                use_material(m)
+                for backend in backends:
+                    result = optimize(backend)
+                    records.append(
+                        {
+                            "backend": backend,
+                            "case": (m, load_case),
+                            "nfev": int(result.nfev),
+                            "wall_time": result.wall_time,
+                            "cost": float(result.fun),
+                            "feasible": bool(result.feasible),
+                        }
+                    )
+    finally:
+        use_load_case(*previous_load_case)
+        use_material(previous_material)
+
+    winner = pick_fastest_reliable(records)
+    if save:
+        save_solver_choice(winner)
+    return winner, records
+
+
+if __name__ == "__main__":
+    import sys
+
+    if "--tournament" in sys.argv:
+        winner, records = run_tournament()
+        print("Tournament:")
+        for backend in solver_dict:
+            rows = [r for r in records if r["backend"] == backend]
+            print(
+                f"{backend:>24}: nfev {sum(r['nfev'] for r in rows):>7}, "
+                f"time {sum(r['wall_time'] for r in rows):8.3f} s, "
+                f"feasible {sum(r['feasible'] for r in rows)}/{len(rows)}"
+            )
+        print(f"Selected solver: {winner}")
+        print()
+
+    best_material, result, records = optimize_material()
+
+    print(f"Results ({select_solver()}):")
+
+    for i in records:
+        print(f"Material: {i['material']}")
+        print(f"Lower Bound: ${i['lower_bound']:.2f}")
+        if i["cost"] is None:
+            print(f"Minimum Cost: {i['status']}")
+        else:
+            print(f"Minimum Cost: ${i['cost']:.2f}")
+        print()
+
+    print(f"Best Material: {best_material}")
+    if best_material is not None:
+        print(f"Minimum Cost: ${result.fun:.2f}")
+        print(f"Optimal x: {[round(float(val), 3) for val in result.x]}")
@@ -4,7 +4,7 @@ todo:
 - minimize cost using scipy
 """
 
-from numpy import pi, sqrt, sin, cos, tan, radians, degrees, arcsin, abs
+from numpy import pi, sqrt, sin, cos, tan, radians, degrees, arcsin, abs, minimum, asarray
 
 # Constants
 material_dict = {  # density in lb/in^3, cost in $/lb, Young's modulus in psi, yield strength in psi, ultimate tensile strength in psi
@@ -48,6 +48,17 @@ HEIGHT_LIFTED = 6.0  # inches
 HOLE_DIAMETER = 0.5  # inches
 FORCE = 3000  # lbs
 STARTING_HEIGHT = 6.0 #inches
+CROSSBAR_MATERIAL = "steel 1030 1000C"  # the crossbar is always steel
+
+material_names = list(material_dict)  # material index -> name, for array inputs
+MIN_SAFETY_FACTORS = {  # smallest acceptable safety factor of every failure mode
+    "buckling_xx": 10,  # diagonal buckling about the x axis
+    "buckling_yy": 6,  # diagonal buckling about the y axis
+    "tensile": 4,  # crossbar
+    "tearout": 5,
+    "bearing": 4,
+    "axial": 4,
+}
 
 def model(
     length_diagonal: float,  # inches
@@ -96,72 +107,15 @@ def model(
         - Cost ($)
     """
 
-    # Calculated values
-    start_angle = degrees(arcsin(start_height / 2 / (length_diagonal-2*hole_offset)))  # (degrees)
-    length_cb = calc_length_crossbar(
-        length_diagonal,
-        start_height,
-        )
-
-    F_d = calc_diagonal_force(FORCE, start_angle)  # (lbs)
-    F_cb = calc_crossbar_force(FORCE, start_angle)  # (lbs)
-    E = material_dict[material]["E"]  # (psi)
-    S_y = material_dict[material]["S_y"]  # (psi)
-    S_UT = material_dict[material]["S_UT"]  # (psi)
-
-    P_cr = calc_critical_buckling_load(
-        E,
+    n_buckling, n_tensile, n_tearout, n_bearing, n_axial, weight, cost = evaluate(
         length_diagonal,
         cross_section_height,
         cross_section_width,
         material_thickness,
-        hole_offset,
-    )
-
-    n_buckling = P_cr / F_d
-    n_tensile = material_dict["steel 1030 1000C"]["S_y"] / calc_crossbar_stress(
-        F_cb,
         crossbar_diameter,
-    )
-    n_tearout = S_y / calc_tearout_stress(
         hole_offset,
-        material_thickness,
-        F_d,
-    )
-    n_bearing = S_y / calc_bearing_stress(
-        HOLE_DIAMETER,
-        material_thickness,
-        F_d,
-    )
-    n_axial = S_y / calc_diagonal_axial_stress(
-        HOLE_DIAMETER,
-        material_thickness,
-        cross_section_height,
-        F_d,
-    )
-    weight = calc_weight(
-        length_diagonal,
-        cross_section_height,
-        cross_section_width,
-        material_thickness,
-        HOLE_DIAMETER,
-        crossbar_diameter,
-        length_cb,
-        material_dict[material]["density"],
-        material_dict["steel 1030 1000C"]["density"],
-    )
-    cost = calc_cost(
-        length_diagonal,
-        cross_section_height,
-        cross_section_width,
-        material_thickness,
-        HOLE_DIAMETER,
-        crossbar_diameter,
-        length_cb,
-        material_dict[material]["density"],
-        material_dict["steel 1030 1000C"]["density"],
-        material_dict[material]["cost"],
-        material_dict["steel 1030 1000C"]["cost"],
+        start_height,
+        material,
     )
 
     print(f"Diagonal Buckling Safety Factor: {n_buckling:.5f}")
@@ -189,6 +143,210 @@ def model(
     )
 
 
+def evaluate(
+    length_diagonal,  # inches
+    cross_section_height,  # inches
+    cross_section_width,  # inches
+    material_thickness,  # inches
+    crossbar_diameter,  # inches
+    hole_offset,  # inches
+    start_height,  # inches
+    material,
+    force=FORCE,  # lbs
+):
+    """
+    Calculates the same values as model() without printing them.
+
+    Every argument can be a float or a numpy array, so a whole batch of
+    designs is evaluated in one call. For array inputs, material is an array
+    of indices into material_names.
+
+    Returns
+    -------
+    tuple of floats or arrays
+        Same as model().
+    """
+
+    # Calculated values
+    start_angle = degrees(arcsin(start_height / 2 / (length_diagonal-2*hole_offset)))  # (degrees)
+    length_cb = calc_length_crossbar(
+        length_diagonal,
+        start_height,
+        )
+
+    F_d = calc_diagonal_force(force, start_angle)  # (lbs)
+    F_cb = calc_crossbar_force(force, start_angle)  # (lbs)
+    E = material_property(material, "E")  # (psi)
+    S_y = material_property(material, "S_y")  # (psi)
+    min_I = minimum(
+        *calc_moments_of_inertia(
+            cross_section_height,
+            cross_section_width,
+            material_thickness,
+        )
+    )  # smaller of the two moments of inertia (inches^4)
+
+    n_buckling = calc_buckling_safety_factor(
+        E,
+        min_I,
+        length_diagonal - 2 * hole_offset,
+        F_d,
+    )
+    n_tensile = calc_tensile_safety_factor(F_cb, crossbar_diameter)
+    n_tearout = calc_yield_safety_factor(
+        S_y,
+        calc_tearout_stress(hole_offset, material_thickness, F_d),
+    )
+    n_bearing = calc_yield_safety_factor(
+        S_y,
+        calc_bearing_stress(HOLE_DIAMETER, material_thickness, F_d),
+    )
+    n_axial = calc_yield_safety_factor(
+        S_y,
+        calc_diagonal_axial_stress(
+            HOLE_DIAMETER,
+            material_thickness,
+            cross_section_height,
+            F_d,
+        ),
+    )
+
+    mass_d = calc_diagonal_mass(
+        calc_diagonal_volume(
+            length_diagonal,
+            cross_section_height,
+            cross_section_width,
+            material_thickness,
+            HOLE_DIAMETER,
+        ),
+        material_property(material, "density"),
+    )
+    mass_cb = calc_crossbar_mass(
+        calc_crossbar_volume(crossbar_diameter, length_cb),
+        material_dict[CROSSBAR_MATERIAL]["density"],
+    )
+    weight = mass_d + mass_cb
+    cost = calc_mass_cost(
+        mass_d,
+        mass_cb,
+        material_property(material, "cost"),
+        material_dict[CROSSBAR_MATERIAL]["cost"],
+    )
+
+    return (
+        n_buckling,
+        n_tensile,
+        n_tearout,
+        n_bearing,
+        n_axial,
+        weight,
+        cost,
+    )
+
+
+def material_property(
+    material,  # material name, tuple of names, or array of indices into material_names
+    key: str,
+):
+    """
+    Looks up a property from material_dict for a single material name, or
+    as an array for a tuple (or list) of names or an array of material
+    indices.
+    """
+    if isinstance(material, str):
+        return material_dict[material][key]
+    if isinstance(material, (tuple, list)) and all(isinstance(m, str) for m in material):
+        return asarray([material_dict[m][key] for m in material])
+    return asarray([material_dict[m][key] for m in material_names])[material]
+
+
+def evaluate_buckling(
+    length_diagonal,  # inches
+    cross_section_height,  # inches
+    cross_section_width,  # inches
+    material_thickness,  # inches
+    hole_offset,  # inches
+    start_height,  # inches
+    material,
+    force=FORCE,  # lbs
+):
+    """
+    Calculates the diagonal buckling safety factors about the x and y axes,
+    the way the buckling constraints of minimize_cost.py do. Takes floats
+    or arrays like evaluate().
+
+    Returns
+    -------
+    tuple of floats or arrays
+        - Buckling safety factor about the x axis
+        - Buckling safety factor about the y axis
+    """
+    l = length_diagonal - 2 * hole_offset  # length of the diagonal between the two pins
+    start_angle = degrees(arcsin(start_height / 2 / length_diagonal))  # (degrees)
+    F_d = calc_diagonal_force(force, start_angle)  # (lbs)
+    E = material_property(material, "E")  # (psi)
+
+    I_xx, I_yy = calc_moments_of_inertia(
+        cross_section_height,
+        cross_section_width,
+        material_thickness,
+    )
+    return (
+        calc_buckling_safety_factor(E, I_xx, l, F_d),
+        calc_buckling_safety_factor(E, I_yy, l, F_d),
+    )
+
+
+def is_safe(
+    n_buckling_xx,
+    n_buckling_yy,
+    n_tensile,
+    n_tearout,
+    n_bearing,
+    n_axial,
+):
+    """
+    Checks the safety factors against MIN_SAFETY_FACTORS. The buckling
+    factors come from evaluate_buckling(), the rest from evaluate(). Works
+    elementwise on arrays; nan (an impossible geometry) counts as unsafe.
+    """
+    return (
+        (n_buckling_xx >= MIN_SAFETY_FACTORS["buckling_xx"])
+        & (n_buckling_yy >= MIN_SAFETY_FACTORS["buckling_yy"])
+        & (n_tensile >= MIN_SAFETY_FACTORS["tensile"])
+        & (n_tearout >= MIN_SAFETY_FACTORS["tearout"])
+        & (n_bearing >= MIN_SAFETY_FACTORS["bearing"])
+        & (n_axial >= MIN_SAFETY_FACTORS["axial"])
+    )
+
+
+def is_valid_geometry(
+    length_diagonal,  # inches
+    cross_section_height,  # inches
+    cross_section_width,  # inches
+    material_thickness,  # inches
+    crossbar_diameter,  # inches
+    hole_offset,  # inches
+    start_height=STARTING_HEIGHT,  # inches
+    height_lifted=HEIGHT_LIFTED,  # inches
+):
+    """
+    Checks the geometric constraints from minimize_cost.py (con7 to con11):
+    the jack reaches the lifted height at no more than 80 degrees, the
+    crossbar fits inside the channel, and the hole offset is reasonable.
+    Works elementwise on arrays.
+    """
+    l = length_diagonal - 2 * hole_offset  # length between the pins
+    final_height = start_height + height_lifted
+    return (
+        (l >= final_height / 2)
+        & (final_height / 2 <= l * sin(radians(80)))
+        & (cross_section_height - 2 * material_thickness - crossbar_diameter >= 0)
+        & (cross_section_width - 2 * material_thickness - crossbar_diameter >= 0)
+        & (length_diagonal - 10 * hole_offset >= 0)
+    )
+
+
 def calc_diagonal_force(
     force: float,  # lbs
     start_angle: float,  # degrees
@@ -341,10 +499,23 @@ def calc_critical_buckling_load(
     E is the Young's modulus, I is the smaller moment of inertia, and l
     is the length of the diagonal between the two pins.
     """
-    min_I = min(
-        calc_moments_of_inertia(h, w, t)
+    min_I = minimum(
+        *calc_moments_of_inertia(h, w, t)
     )  # smaller of the two moments of inertia
     l = length_diagonal - 2 * hole_offset  # length of the diagonal between the two pins
+
+    return calc_euler_buckling_load(E, min_I, l)
+
+
+def calc_euler_buckling_load(
+    E: float,  # Young's modulus (psi)
+    min_I: float,  # smaller moment of inertia (inches^4)
+    l: float,  # length of the diagonal between the two pins (inches)
+) -> float:  # lbs
+    """
+    Euler's formula from calc_critical_buckling_load, for when the moment of
+    inertia is already known.
+    """
     C = 1.2  # end condition factor for pinned-pinned
 
     P_cr = C * pi**2 * E * min_I / l**2
@@ -376,6 +547,29 @@ def calc_bearing_stress(
     return abs(F_d / (2 * t * d_h))
 
 
+def calc_buckling_safety_factor(
+    E: float,  # Young's modulus (psi)
+    I: float,  # moment of inertia (inches^4)
+    l: float,  # length of the diagonal between the two pins (inches)
+    F_d: float,  # diagonal force (lbs)
+) -> float:
+    return calc_euler_buckling_load(E, I, l) / F_d
+
+
+def calc_tensile_safety_factor(
+    F_cb: float,  # crossbar force (lbs)
+    d_cb: float,  # diameter of crossbar (inches)
+) -> float:
+    return material_dict[CROSSBAR_MATERIAL]["S_y"] / calc_crossbar_stress(F_cb, d_cb)
+
+
+def calc_yield_safety_factor(
+    S_y: float,  # yield strength of the diagonal material (psi)
+    stress: float,  # tearout, bearing or axial stress (psi)
+) -> float:
+    return S_y / stress
+
+
 # I don't think we need this
 #
 # def calc_crossbar_bearing_stress(
@@ -423,13 +617,10 @@ def calc_weight(
     float
         Weight of the jack in pounds.
     """
-    # Volume of one diagonal member, subtracting the volume of the holes
-    volume_d = l_d * (h * w - (w - 2 * t) * (h - t)) - pi * d_h**2 * t
-    # Volume of the crossbar
-    volume_cb = pi * (d_cb / 2) ** 2 * l_cb
+    volume_d = calc_diagonal_volume(l_d, h, w, t, d_h)
+    volume_cb = calc_crossbar_volume(d_cb, l_cb)
 
-    # 4 diagonal members, 1 crossbar
-    return 4 * volume_d * density_d + volume_cb * density_cb  # lbs
+    return calc_diagonal_mass(volume_d, density_d) + calc_crossbar_mass(volume_cb, density_cb)  # lbs
 
 
 def calc_cost(
@@ -477,13 +668,64 @@ def calc_cost(
         Cost of the jack ($).
     """
 
-    # Volume of one diagonal member, subtracting the volume of the holes
-    volume_d = l_d * (h * w - (w - 2 * t) * (h - t)) - pi * d_h**2 * t
-    # Volume of the crossbar
-    volume_cb = pi * (d_cb / 2) ** 2 * l_cb
+    volume_d = calc_diagonal_volume(l_d, h, w, t, d_h)
+    volume_cb = calc_crossbar_volume(d_cb, l_cb)
+
+    return calc_mass_cost(
+        calc_diagonal_mass(volume_d, density_d),
+        calc_crossbar_mass(volume_cb, density_cb),
+        cost_d,
+        cost_cb,
+    )  # $
+
+
+def calc_diagonal_volume(
+    l_d: float,  # length of diagonal (inches)
+    h: float,  # cross-section height (inches)
+    w: float,  # cross-section width (inches)
+    t: float,  # material thickness (inches)
+    d_h: float,  # diameter of hole (inches)
+) -> float:  # inches^3
+    """
+    Calculates the volume of one diagonal member, subtracting the volume of the holes.
+    """
+    return l_d * (h * w - (w - 2 * t) * (h - t)) - pi * d_h**2 * t
+
+
+def calc_crossbar_volume(
+    d_cb: float,  # diameter of crossbar (inches)
+    l_cb: float,  # length of crossbar (inches)
+) -> float:  # inches^3
+    """
+    Calculates the volume of the crossbar.
+    """
+    return pi * (d_cb / 2) ** 2 * l_cb
+
+
+def calc_diagonal_mass(
+    volume_d: float,  # volume of one diagonal member (inches^3)
+    density_d: float,  # material density (lb/in^3)
+) -> float:  # lbs
+    """
+    Calculates the mass of the 4 diagonal members.
+    """
+    return 4 * volume_d * density_d
+
+
+def calc_crossbar_mass(
+    volume_cb: float,  # volume of the crossbar (inches^3)
+    density_cb: float,  # material density (lb/in^3)
+) -> float:  # lbs
+    return volume_cb * density_cb
+
 
-    # 4 diagonal members, 1 crossbar
-    return 4 * volume_d * density_d * cost_d + volume_cb * density_cb * cost_cb  # $
+def calc_mass_cost(
+    mass_d: float,  # mass of the diagonal members (lbs)
+    mass_cb: float,  # mass of the crossbar (lbs)
+    cost_d: float,  # diagonal material cost ($/lb)
+    cost_cb: float,  # crossbar material cost ($/lb)
+) -> float:  # $
+    return mass_d * cost_d + mass_cb * cost_cb
 
 
 def calc_length_crossbar(
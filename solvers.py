@@ -0,0 +1,240 @@
+"""
+Solver backends for the jack cost optimization.
+
+Every backend takes the same objective, constraint dicts and bounds that
+minimize_cost.py builds, so switching solvers never touches the model.
+"""
+
+import json
+import os
+import time
+import warnings
+
+from numpy import array, clip, inf, nan_to_num
+from scipy.optimize import (
+    NonlinearConstraint,
+    OptimizeResult,
+    differential_evolution,
+    minimize,
+    shgo,
+)
+
+SOLVER_CHOICE_FILE = os.path.join(os.path.dirname(__file__), "solver_choice.json")
+DEFAULT_SOLVER = "COBYQA"
+FEASIBILITY_TOL = 1e-6
+
+# trust-constr's quasi-Newton update complains whenever a step leaves the
+# (piecewise linear) objective unchanged; it recovers on its own
+warnings.filterwarnings("ignore", message="delta_grad == 0.0")
+
+
+def _nan_as_violated(constraints):
+    # Samples outside the arcsin domain give nan; the global backends need
+    # them reported as violated instead.
+    return [
+        {"type": c["type"], "fun": lambda x, f=c["fun"]: nan_to_num(f(x), nan=-1e10)}
+        for c in constraints
+    ]
+
+
+def run_cobyqa(obj, x0, constraints, bounds):
+    return minimize(
+        obj,
+        x0,
+        constraints=constraints,
+        bounds=bounds,
+        method="COBYQA",
+        options={"disp": False, "maxiter": 10000, "maxfev": 10000, "initial_tr_radius": 0.01},
+    )
+
+
+def run_slsqp(obj, x0, constraints, bounds):
+    return minimize(
+        obj,
+        x0,
+        constraints=constraints,
+        bounds=bounds,
+        method="SLSQP",
+        options={"disp": False, "maxiter": 1000, "ftol": 1e-9},
+    )
+
+
+def run_trust_constr(obj, x0, constraints, bounds):
+    return minimize(
+        obj,
+        x0,
+        constraints=_nan_as_violated(constraints),
+        bounds=bounds,
+        method="trust-constr",
+        options={"disp": False, "maxiter": 5000},
+    )
+
+
+def run_differential_evolution(obj, x0, constraints, bounds):
+    # differential_evolution only takes constraint objects, so the
+    # inequality dicts are stacked into a single vector constraint
+    constraints = _nan_as_violated(constraints)
+    return differential_evolution(
+        obj,
+        bounds,
+        x0=clip(x0, [b[0] for b in bounds], [b[1] for b in bounds]),
+        constraints=NonlinearConstraint(
+            lambda x: array([c["fun"](x) for c in constraints]),
+            0,
+            inf,
+        ),
+        seed=0,
+        maxiter=300,
+        tol=1e-8,
+        polish=False,
+    )
+
+
+def run_shgo(obj, x0, constraints, bounds):
+    return shgo(
+        obj,
+        bounds,
+        constraints=_nan_as_violated(constraints),
+        n=256,
+        iters=1,
+        sampling_method="sobol",
+    )
+
+
+solver_dict = {  # backend name -> function(obj, x0, constraints, bounds) returning an OptimizeResult
+    "COBYQA": run_cobyqa,
+    "SLSQP": run_slsqp,
+    "trust-constr": run_trust_constr,
+    "differential_evolution": run_differential_evolution,
+    "shgo": run_shgo,
+}
+
+
+def solve(
+    backend: str,
+    obj,
+    x0,
+    constraints: list[dict],
+    bounds: list[tuple[float, float]],
+):
+    """
+    Runs one solver backend on the given problem.
+
+    Parameters
+    ----------
+    backend : str
+        Name of the backend, referenced from solver_dict.
+    obj : callable
+        Objective function of the design vector.
+    x0 : list of floats
+        Initial guess (ignored by the global backends that sample the bounds).
+    constraints : list of dict
+        Inequality constraints in scipy's dict form.
+    bounds : list of tuple
+        (lower, upper) bound for every design variable.
+
+    Returns
+    -------
+    OptimizeResult
+        The scipy result with two extra fields (a failed result with x=None
+        if the backend raised a numerical error):
+        - wall_time: seconds spent in the solver
+        - feasible: whether result.x satisfies every bound and constraint
+    """
+    start = time.perf_counter()
+    try:
+        result = solver_dict[backend](obj, x0, constraints, bounds)
+    except (ValueError, ArithmeticError) as e:  # e.g. nan reaching a linear algebra routine
+        result = OptimizeResult(x=None, fun=inf, nfev=0, success=False, message=str(e))
+    result.wall_time = time.perf_counter() - start
+    result.feasible = is_feasible(result.x, constraints, bounds)
+    if not hasattr(result, "nfev"):
+        result.nfev = 0
+    if result.fun is None:  # shgo reports no point at all when nothing was feasible
+        result.fun = inf
+    return result
+
+
+def is_feasible(
+    x,
+    constraints: list[dict],
+    bounds: list[tuple[float, float]],
+    tol: float = FEASIBILITY_TOL,
+) -> bool:
+    """
+    Checks a design vector against every bound and inequality constraint.
+    """
+    if x is None:
+        return False
+    for x_i, (low, high) in zip(x, bounds):
+        if not (low - tol <= x_i <= high + tol):
+            return False
+    for c in constraints:
+        value = c["fun"](x)
+        if value is None or not value >= -tol:  # also catches nan
+            return False
+    return True
+
+
+def pick_fastest_reliable(
+    records: list[dict],
+    cost_tol: float = 0.01,
+) -> str:
+    """
+    Picks the fastest backend that solved every calibration case.
+
+    A backend is reliable on a case when its answer is feasible and within
+    cost_tol (relative) of the cheapest feasible answer any backend found for
+    that case. Cases no backend solved are left out. Among the reliable
+    backends, the one with the smallest total wall time wins.
+
+    Parameters
+    ----------
+    records : list of dict
+        Tournament records with the keys "backend", "case", "cost",
+        "feasible" and "wall_time".
+    cost_tol : float
+        Relative cost tolerance used to judge reliability.
+
+    Returns
+    -------
+    str
+        Name of the winning backend, or DEFAULT_SOLVER if none is reliable
+        or no case was solved.
+    """
+    best_cost = {}
+    for r in records:
+        if r["feasible"]:
+            best_cost[r["case"]] = min(best_cost.get(r["case"], inf), r["cost"])
+
+    reliable = {}
+    total_time = {}
+    for r in records:
+        if r["case"] not in best_cost:  # no backend solved it, so it can't tell them apart
+            continue
+        ok = r["feasible"] and r["cost"] <= best_cost[r["case"]] * (1 + cost_tol)
+        reliable[r["backend"]] = reliable.get(r["backend"], True) and ok
+        total_time[r["backend"]] = total_time.get(r["backend"], 0) + r["wall_time"]
+
+    candidates = [b for b in reliable if reliable[b]]
+    if not candidates:
+        return DEFAULT_SOLVER
+    return min(candidates, key=lambda b: total_time[b])
+
+
+def save_solver_choice(backend: str, path: str = SOLVER_CHOICE_FILE) -> None:
+    with open(path, "w") as f:
+        json.dump({"solver": backend}, f)
+
+
+def select_solver(path: str = SOLVER_CHOICE_FILE) -> str:
+    """
+    Returns the backend picked by the last tournament, or DEFAULT_SOLVER if
+    no tournament has been run yet.
+    """
+    try:
+        with open(path) as f:
+            backend = json.load(f)["solver"]
+    except (OSError, ValueError, KeyError):
+        return DEFAULT_SOLVER
+    return backend if backend in solver_dict else DEFAULT_SOLVER
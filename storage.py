@@ -0,0 +1,372 @@
+"""
+Compact, memory-mapped storage for large evaluation sweeps.
+
+A store is a directory holding one .npy file per column, a packed
+feasibility bitmap and a meta.json describing the encoding. Every file is
+opened with numpy's memmap, so sweeps are written straight to disk and
+filters like "feasible and cost < X" run chunk by chunk without loading
+the data into RAM.
+
+Column encodings:
+- "float64": full precision, 8 bytes per value
+- "float32": 4 bytes per value
+- "uint16": linear quantization over a fixed (low, high) range, 2 bytes per
+  value. Values below or above the range get reserved codes and read back
+  as -inf or +inf, so filters never mistake them for in-range values; nan
+  is kept as nan.
+"""
+
+import json
+import os
+
+from numpy import (
+    arange,
+    asarray,
+    clip,
+    concatenate,
+    float64,
+    inf,
+    isnan,
+    min_scalar_type,
+    nan,
+    packbits,
+    prod,
+    rint,
+    uint8,
+    uint16,
+    unpackbits,
+    unravel_index,
+    where,
+)
+from numpy.lib.format import open_memmap
+
+from model import (
+    FORCE,
+    HEIGHT_LIFTED,
+    STARTING_HEIGHT,
+    evaluate,
+    evaluate_buckling,
+    is_safe,
+    is_valid_geometry,
+    material_names,
+)
+
+INPUT_COLUMNS = (
+    "length_diagonal",
+    "cross_section_height",
+    "cross_section_width",
+    "material_thickness",
+    "crossbar_diameter",
+    "hole_offset",
+)
+OUTPUT_COLUMNS = (
+    "n_buckling",
+    "n_tensile",
+    "n_tearout",
+    "n_bearing",
+    "n_axial",
+    "weight",
+    "cost",
+)
+COLUMN_DTYPES = ("float64", "float32", "uint16")
+
+QUANTIZE_RANGES = {  # (low, high) used by the "uint16" encoding
+    "length_diagonal": (0, 40),  # inches
+    "cross_section_height": (0, 10),  # inches
+    "cross_section_width": (0, 10),  # inches
+    "material_thickness": (0, 2),  # inches
+    "crossbar_diameter": (0, 4),  # inches
+    "hole_offset": (0, 2),  # inches
+    "n_buckling": (0, 100),
+    "n_tensile": (0, 100),
+    "n_tearout": (0, 100),
+    "n_bearing": (0, 100),
+    "n_axial": (0, 100),
+    "weight": (0, 200),  # lbs
+    "cost": (0, 1000),  # $
+}
+QUANTIZE_NAN = 65535  # uint16 code reserved for nan
+QUANTIZE_ABOVE = 65534  # uint16 code reserved for values above high, read as +inf
+QUANTIZE_BELOW = 65533  # uint16 code reserved for values below low, read as -inf
+QUANTIZE_STEPS = 65532  # codes 0..65532 span (low, high)
+
+DEFAULT_CHUNK_SIZE = 2**20  # rows per chunk, must be a multiple of 8
+
+
+class ResultStore:
+    """
+    A directory of memory-mapped result columns.
+
+    Use create_store() to make a new store and open_store() to read one.
+    """
+
+    def __init__(self, path: str, meta: dict, mode: str):
+        self.path = path
+        self.meta = meta
+        self.n = meta["n"]
+        self.columns = {
+            name: open_memmap(os.path.join(path, name + ".npy"), mode=mode)
+            for name in meta["columns"]
+        }
+        self.material = open_memmap(os.path.join(path, "material.npy"), mode=mode)
+        self.feasible_bits = open_memmap(os.path.join(path, "feasible.npy"), mode=mode)
+
+    def write(
+        self,
+        start: int,
+        values: dict,
+        material,
+        feasible,
+    ) -> None:
+        """
+        Writes one chunk of rows starting at row start.
+
+        Parameters
+        ----------
+        start : int
+            First row of the chunk. Must be a multiple of 8 so the
+            feasibility bits line up with whole bytes.
+        values : dict
+            Column name -> array of float values for the chunk.
+        material : array of ints
+            Indices into material_names.
+        feasible : array of bools
+            Whether each design is safe and geometrically valid.
+        """
+        if start % 8:
+            raise ValueError("chunks must start on a multiple of 8 rows")
+        feasible = asarray(feasible, dtype=bool)
+        stop = start + len(feasible)
+        for name, column in self.columns.items():
+            column[start:stop] = self.encode(name, values[name])
+        self.material[start:stop] = material
+        bits = packbits(feasible)
+        self.feasible_bits[start // 8 : start // 8 + len(bits)] = bits
+
+    def encode(self, name: str, values):
+        if self.meta["dtype"] != "uint16":
+            return values
+        low, high = self.meta["ranges"][name]
+        values = asarray(values, dtype=float64)
+        codes = rint((clip(values, low, high) - low) / (high - low) * QUANTIZE_STEPS)
+        codes[values > high] = QUANTIZE_ABOVE
+        codes[values < low] = QUANTIZE_BELOW
+        codes[isnan(values)] = QUANTIZE_NAN
+        return codes.astype(uint16)
+
+    def decode(self, name: str, codes):
+        if self.meta["dtype"] != "uint16":
+            return asarray(codes)
+        low, high = self.meta["ranges"][name]
+        values = low + asarray(codes, dtype=float64) * ((high - low) / QUANTIZE_STEPS)
+        values[codes == QUANTIZE_ABOVE] = inf
+        values[codes == QUANTIZE_BELOW] = -inf
+        values[codes == QUANTIZE_NAN] = nan
+        return values
+
+    def column(self, name: str, start: int = 0, stop: int = None):
+        """
+        Returns rows start:stop of a column as floats. Only that slice is
+        read from disk.
+        """
+        stop = self.n if stop is None else stop
+        return self.decode(name, self.columns[name][start:stop])
+
+    def feasible(self, start: int = 0, stop: int = None):
+        """
+        Returns rows start:stop of the feasibility bitmap as bools.
+        """
+        stop = self.n if stop is None else stop
+        bits = unpackbits(self.feasible_bits[start // 8 : (stop + 7) // 8])
+        offset = start % 8
+        return bits[offset : offset + stop - start].astype(bool)
+
+    def where(
+        self,
+        max_cost: float = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ):
+        """
+        Finds the rows that are feasible and, optionally, cost less than
+        max_cost. The store is scanned one chunk at a time, so memory use is
+        bounded by the chunk size plus the number of matches. A cost above
+        the "uint16" range reads as +inf, so it never matches.
+
+        Returns
+        -------
+        array of ints
+            Matching row indices.
+        """
+        matches = []
+        for start in range(0, self.n, chunk_size):
+            stop = min(start + chunk_size, self.n)
+            keep = self.feasible(start, stop)
+            if max_cost is not None and keep.any():
+                keep &= self.column("cost", start, stop) < max_cost
+            matches.append(start + where(keep)[0])
+        return concatenate(matches) if matches else arange(0)
+
+    def flush(self) -> None:
+        for column in self.columns.values():
+            column.flush()
+        self.material.flush()
+        self.feasible_bits.flush()
+
+
+def create_store(
+    path: str,
+    n: int,
+    dtype: str = "float32",
+    columns: tuple = INPUT_COLUMNS + OUTPUT_COLUMNS,
+    ranges: dict = None,
+) -> ResultStore:
+    """
+    Creates an empty store for n rows on disk.
+
+    Parameters
+    ----------
+    path : str
+        Directory to create the store in.
+    n : int
+        Number of rows.
+    dtype : str
+        Column encoding, one of COLUMN_DTYPES.
+    columns : tuple of str
+        Columns to keep. Dropping the inputs of a regular grid saves space,
+        since sweep_indices() can rebuild them from the row number.
+    ranges : dict, optional
+        (low, high) per column for the "uint16" encoding. Defaults to
+        QUANTIZE_RANGES.
+
+    Returns
+    -------
+    ResultStore
+        The new store, open for writing.
+    """
+    if dtype not in COLUMN_DTYPES:
+        raise ValueError(f"dtype must be one of {COLUMN_DTYPES}, not {dtype!r}")
+    ranges = {**QUANTIZE_RANGES, **(ranges or {})}
+    meta = {
+        "n": n,
+        "dtype": dtype,
+        "columns": list(columns),
+        "ranges": {name: list(ranges[name]) for name in columns},
+        "materials": material_names,
+    }
+
+    os.makedirs(path, exist_ok=True)
+    with open(os.path.join(path, "meta.json"), "w") as f:
+        json.dump(meta, f, indent=2)
+    for name in columns:
+        open_memmap(os.path.join(path, name + ".npy"), mode="w+", dtype=dtype, shape=(n,))
+    # smallest unsigned type that holds every material index, so a bigger
+    # catalog widens the column instead of wrapping around
+    material_dtype = min_scalar_type(max(len(material_names) - 1, 0))
+    open_memmap(os.path.join(path, "material.npy"), mode="w+", dtype=material_dtype, shape=(n,))
+    open_memmap(os.path.join(path, "feasible.npy"), mode="w+", dtype=uint8, shape=((n + 7) // 8,))
+
+    return ResultStore(path, meta, mode="r+")
+
+
+def open_store(path: str, mode: str = "r") -> ResultStore:
+    """
+    Opens an existing store. mode is "r" for read only or "r+" to update it.
+    """
+    with open(os.path.join(path, "meta.json")) as f:
+        meta = json.load(f)
+    return ResultStore(path, meta, mode=mode)
+
+
+def sweep_indices(
+    grid: dict,
+    materials: list[int],
+    start: int,
+    stop: int,
+) -> tuple[dict, object]:
+    """
+    Rebuilds the inputs of rows start:stop of a full-factorial sweep.
+
+    Returns
+    -------
+    tuple
+        - Input column name -> array of values
+        - Array of material indices
+    """
+    shape = [len(grid[name]) for name in INPUT_COLUMNS] + [len(materials)]
+    index = unravel_index(arange(start, stop), shape)
+    inputs = {
+        name: asarray(grid[name], dtype=float64)[i]
+        for name, i in zip(INPUT_COLUMNS, index)
+    }
+    return inputs, asarray(materials)[index[-1]]
+
+
+def sweep(
+    path: str,
+    grid: dict,
+    materials: list[int] = None,
+    dtype: str = "float32",
+    columns: tuple = INPUT_COLUMNS + OUTPUT_COLUMNS,
+    start_height: float = STARTING_HEIGHT,  # inches
+    height_lifted: float = HEIGHT_LIFTED,  # inches
+    force: float = FORCE,  # lbs
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> ResultStore:
+    """
+    Evaluates every combination of the grid values and materials and writes
+    the results straight into a new store.
+
+    Parameters
+    ----------
+    path : str
+        Directory to create the store in.
+    grid : dict
+        Input column name -> 1D array of values to sweep.
+    materials : list of int, optional
+        Indices into material_names. Defaults to every material.
+    dtype : str
+        Column encoding, one of COLUMN_DTYPES.
+    columns : tuple of str
+        Columns to keep, see create_store().
+    start_height : float
+        The height at which the jack is started.
+    height_lifted : float
+        How far the jack has to lift.
+    force : float
+        The force applied to the jack.
+    chunk_size : int
+        Rows evaluated per chunk, must be a multiple of 8.
+
+    Returns
+    -------
+    ResultStore
+        The filled store.
+    """
+    if chunk_size % 8:
+        raise ValueError("chunk_size must be a multiple of 8")
+    materials = list(range(len(material_names))) if materials is None else materials
+    n = int(prod([len(grid[name]) for name in INPUT_COLUMNS])) * len(materials)
+    store = create_store(path, n, dtype=dtype, columns=columns)
+
+    for start in range(0, n, chunk_size):
+        stop = min(start + chunk_size, n)
+        inputs, material = sweep_indices(grid, materials, start, stop)
+        outputs = evaluate(*inputs.values(), start_height, material, force=force)
+        values = {**inputs, **dict(zip(OUTPUT_COLUMNS, outputs))}
+        buckling = evaluate_buckling(
+            inputs["length_diagonal"],
+            inputs["cross_section_height"],
+            inputs["cross_section_width"],
+            inputs["material_thickness"],
+            inputs["hole_offset"],
+            start_height,
+            material,
+            force=force,
+        )
+        feasible = is_safe(*buckling, *outputs[1:5]) & is_valid_geometry(
+            *inputs.values(), start_height, height_lifted
+        )
+        store.write(start, values, material, feasible)
+
+    store.flush()
+    return store
@@ -0,0 +1,303 @@
+"""
+Surrogate of the minimum jack cost for quick what-if queries.
+
+Offline, run_doe() solves the cost optimization from minimize_cost.py on a
+full-factorial grid of load cases (FORCE, STARTING_HEIGHT, HEIGHT_LIFTED)
+for every material, plus one validation load case at the centre of every
+grid cell. CostSurrogate fits one RBF response surface of log(cost) per
+material to the grid points, and the relative error of the surface at
+each cell centre is kept as the error estimate for that cell.
+
+Online, CostSurrogate.query() answers from the surface when the load case
+lies in a grid cell whose corners were all feasible and whose centre was
+predicted well, and falls back to a real solve otherwise.
+
+usage: python surrogate.py  (runs the default grid and saves surrogate.npz)
+"""
+
+import os
+
+from numpy import (
+    array,
+    asarray,
+    diff,
+    exp,
+    full,
+    isfinite,
+    log,
+    meshgrid,
+    nan,
+    nanmax,
+    ndindex,
+    savez,
+    searchsorted,
+    stack,
+)
+from numpy import load as np_load
+from scipy.interpolate import RBFInterpolator
+
+import minimize_cost as mc
+
+SURROGATE_FILE = os.path.join(os.path.dirname(__file__), "surrogate.npz")
+
+# Default design-of-experiments grid
+DOE_FORCES = (1000, 2000, 3000, 4000, 5000)  # lbs
+DOE_STARTING_HEIGHTS = (4.0, 6.0, 8.0)  # inches
+DOE_HEIGHTS_LIFTED = (4.0, 6.0, 8.0)  # inches
+
+MAX_ERROR = 0.05  # largest relative error answered from the surrogate
+
+
+def run_doe(
+    materials: list[str] = None,
+    forces: tuple = DOE_FORCES,
+    starting_heights: tuple = DOE_STARTING_HEIGHTS,
+    heights_lifted: tuple = DOE_HEIGHTS_LIFTED,
+    backend: str = None,
+):
+    """
+    Solves the cost optimization for every material, at every load case on
+    the grid and at the centre of every grid cell.
+
+    Load cases that minimize_cost.is_surely_infeasible() rules out are not
+    solved.
+
+    Parameters
+    ----------
+    materials : list of str, optional
+        Materials from minimize_cost.material_dict. Defaults to all of them.
+    forces, starting_heights, heights_lifted : tuple of floats
+        Grid values of FORCE, STARTING_HEIGHT and HEIGHT_LIFTED, at least
+        two increasing values each.
+    backend : str, optional
+        Solver backend, see minimize_cost.optimize().
+
+    Returns
+    -------
+    CostSurrogate
+        A surrogate fitted to the results.
+    """
+    materials = list(mc.material_dict) if materials is None else materials
+    axes = _check_axes((forces, starting_heights, heights_lifted))
+    centres = [(a[:-1] + a[1:]) / 2 for a in axes]
+    return CostSurrogate(
+        materials,
+        axes,
+        _solve_grid(materials, axes, backend),
+        _solve_grid(materials, centres, backend),
+    )
+
+
+def _check_axes(axes) -> list:
+    # Every axis needs a cell to interpolate in, and a single value would
+    # make the degree-1 polynomial term of the RBF singular
+    axes = [asarray(a, dtype=float) for a in axes]
+    for name, axis in zip(("forces", "starting_heights", "heights_lifted"), axes):
+        if len(axis) < 2 or not (diff(axis) > 0).all():
+            raise ValueError(f"{name} must hold at least two increasing values, got {axis.tolist()}")
+    return axes
+
+
+def _solve_grid(materials: list[str], axes: list, backend: str = None):
+    # Minimum cost at every load case of the grid spanned by axes, nan
+    # where no feasible design was found
+    cost = full((len(materials),) + tuple(len(a) for a in axes), nan)
+
+    previous_material = mc.material
+    previous_load_case = (mc.FORCE, mc.STARTING_HEIGHT, mc.HEIGHT_LIFTED)
+    try:
+        for index in ndindex(*cost.shape[1:]):
+            mc.use_load_case(*(a[i] for a, i in zip(axes, index)))
+            for m, name in enumerate(materials):
+                if mc.is_surely_infeasible(name):
+                    continue
+                mc.use_material(name)
+                result = mc.optimize(backend)
+                if result.feasible:
+                    cost[(m,) + index] = result.fun
+    finally:
+        mc.use_load_case(*previous_load_case)
+        mc.use_material(previous_material)
+
+    return cost
+
+
+class CostSurrogate:
+    """
+    One RBF response surface of log(minimum cost) per material, over the
+    load cases of a DOE grid.
+
+    Parameters
+    ----------
+    materials : list of str
+        Material names, in the order of the first axis of cost.
+    axes : list of arrays
+        Grid values of FORCE, STARTING_HEIGHT and HEIGHT_LIFTED, at least
+        two increasing values each.
+    cost : array
+        Minimum cost on the grid, shape (materials, forces, starting
+        heights, heights lifted), nan where no feasible design was found.
+    validation_cost : array
+        Minimum cost at the centre of every grid cell, shape (materials,
+        forces - 1, starting heights - 1, heights lifted - 1), nan where no
+        feasible design was found.
+    """
+
+    def __init__(self, materials: list[str], axes: list, cost, validation_cost):
+        self.materials = list(materials)
+        self.axes = _check_axes(axes)
+        self.cost = asarray(cost, dtype=float)
+        self.validation_cost = asarray(validation_cost, dtype=float)
+        self.low = array([a[0] for a in self.axes])
+        self.span = array([a[-1] - a[0] for a in self.axes])
+
+        grid = stack(meshgrid(*self.axes, indexing="ij"), axis=-1)  # load case at every grid point
+        centres = stack(
+            meshgrid(*[(a[:-1] + a[1:]) / 2 for a in self.axes], indexing="ij"), axis=-1
+        )  # load case at every cell centre
+        self.rbf = {}
+        self.validation_error = full(self.validation_cost.shape, nan)  # relative error at the cell centres
+        for m, name in enumerate(self.materials):
+            feasible = isfinite(self.cost[m])
+            values = log(self.cost[m][feasible])
+            if len(values) < 5:  # too few points for a degree-1 thin plate spline
+                continue
+            self.rbf[name] = RBFInterpolator(
+                self.scale(grid[feasible]), values, kernel="thin_plate_spline", degree=1
+            )
+
+            checked = isfinite(self.validation_cost[m])
+            predicted = self.rbf[name](self.scale(centres[checked]))
+            self.validation_error[m][checked] = abs(
+                exp(predicted - log(self.validation_cost[m][checked])) - 1
+            )
+
+    def scale(self, load_cases):
+        # maps load cases onto the unit cube so every axis weighs the same
+        return (asarray(load_cases, dtype=float) - self.low) / self.span
+
+    def error_estimate(
+        self,
+        force: float,  # lbs
+        starting_height: float,  # inches
+        height_lifted: float,  # inches
+        material: str,
+    ) -> float:
+        """
+        Estimated relative error of the surrogate at a load case: the error
+        measured at the centre of the grid cell holding it. Returns inf
+        outside the grid, for unknown materials and for cells with an
+        infeasible corner or centre.
+        """
+        if material not in self.rbf:
+            return float("inf")
+        cell = []
+        for value, axis in zip((force, starting_height, height_lifted), self.axes):
+            if not axis[0] <= value <= axis[-1]:
+                return float("inf")
+            cell.append(min(int(searchsorted(axis, value, side="right")) - 1, len(axis) - 2))
+        m = self.materials.index(material)
+        i, j, k = cell
+        if not isfinite(self.cost[m][i : i + 2, j : j + 2, k : k + 2]).all():
+            return float("inf")
+        error = self.validation_error[m][i, j, k]
+        return float(error) if isfinite(error) else float("inf")
+
+    def query(
+        self,
+        force: float,  # lbs
+        starting_height: float,  # inches
+        height_lifted: float,  # inches
+        material: str,
+        max_error: float = MAX_ERROR,
+    ) -> tuple[float, float, bool]:
+        """
+        Estimates the minimum cost of a jack for a load case.
+
+        Parameters
+        ----------
+        force : float
+            The force applied to the jack.
+        starting_height : float
+            The height at which the jack is started.
+        height_lifted : float
+            How far the jack has to lift.
+        material : str
+            The material, referenced from minimize_cost.material_dict.
+        max_error : float
+            Largest estimated relative error answered from the surrogate.
+            Anything less trusted is solved with minimize_cost.optimize().
+
+        Returns
+        -------
+        tuple
+            - Minimum cost ($), inf if the solver found no feasible design
+            - Estimated relative error (0 for a real solve)
+            - Whether the answer came from the surrogate
+        """
+        error = self.error_estimate(force, starting_height, height_lifted, material)
+        if error <= max_error:
+            point = self.scale([[force, starting_height, height_lifted]])
+            return float(exp(self.rbf[material](point)[0])), error, True
+        return solve(force, starting_height, height_lifted, material), 0.0, False
+
+    def save(self, path: str = SURROGATE_FILE) -> None:
+        savez(
+            path,
+            materials=array(self.materials),
+            forces=self.axes[0],
+            starting_heights=self.axes[1],
+            heights_lifted=self.axes[2],
+            cost=self.cost,
+            validation_cost=self.validation_cost,
+        )
+
+
+def load(path: str = SURROGATE_FILE) -> CostSurrogate:
+    """
+    Loads a surrogate saved by CostSurrogate.save(). Only the DOE results
+    are stored, the surfaces are refitted, which takes well under a second.
+    """
+    with np_load(path) as data:
+        return CostSurrogate(
+            [str(m) for m in data["materials"]],
+            [data["forces"], data["starting_heights"], data["heights_lifted"]],
+            data["cost"],
+            data["validation_cost"],
+        )
+
+
+def solve(
+    force: float,  # lbs
+    starting_height: float,  # inches
+    height_lifted: float,  # inches
+    material: str,
+) -> float:  # $
+    """
+    Minimum cost from a real optimization, inf if no feasible design was
+    found.
+    """
+    previous_material = mc.material
+    previous_load_case = (mc.FORCE, mc.STARTING_HEIGHT, mc.HEIGHT_LIFTED)
+    try:
+        mc.use_load_case(force, starting_height, height_lifted)
+        if mc.is_surely_infeasible(material):
+            return float("inf")
+        mc.use_material(material)
+        result = mc.optimize()
+        return float(result.fun) if result.feasible else float("inf")
+    finally:
+        mc.use_load_case(*previous_load_case)
+        mc.use_material(previous_material)
+
+
+if __name__ == "__main__":
+    surrogate = run_doe()
+    surrogate.save()
+    print(f"Saved {SURROGATE_FILE}")
+    for m, name in enumerate(surrogate.materials):
+        feasible = isfinite(surrogate.cost[m])
+        print(
+            f"{name}: {feasible.sum()}/{feasible.size} load cases feasible, "
+            f"max validation error {nanmax(surrogate.validation_error[m]) if isfinite(surrogate.validation_error[m]).any() else nan:.2%}"
+        )
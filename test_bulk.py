@@ -0,0 +1,52 @@
+import pandas as pd
+import pytest
+
+from bulk import evaluate_file
+
+DESIGN = {
+    "cross_section_height": 1.5,
+    "cross_section_width": 1.5,
+    "material_thickness": 0.45,
+    "crossbar_diameter": 0.6,
+    "hole_offset": 0.76,
+    "material": "AL 5052 h32",
+}
+
+
+def write_designs(path, lengths):
+    # written by hand so "8" stays an integer in the file
+    rows = [",".join(["length_diagonal", *DESIGN])]
+    rows += [",".join([str(l), *map(str, DESIGN.values())]) for l in lengths]
+    path.write_text("\n".join(rows) + "\n")
+
+
+@pytest.mark.parametrize("output", ["out.csv", "out.parquet"])
+def test_chunk_dtypes_can_change(tmp_path, output):
+    # the first chunk reads as int64, the second as float64
+    write_designs(tmp_path / "in.csv", [8, 8, 8, 8, 8.5, 7.6])
+
+    n = evaluate_file(str(tmp_path / "in.csv"), str(tmp_path / output), chunk_size=4)
+
+    assert n == 6
+    result = pd.read_csv(tmp_path / output) if output.endswith(".csv") else pd.read_parquet(tmp_path / output)
+    assert result["length_diagonal"].tolist() == [8, 8, 8, 8, 8.5, 7.6]
+    assert result["cost"].notna().all()
+
+
+@pytest.mark.parametrize("output", ["out.csv", "out.parquet"])
+def test_mark_invalid_in_later_chunk(tmp_path, output):
+    write_designs(tmp_path / "in.csv", [8, 8, 8, 8, "abc", 7.6])
+
+    n = evaluate_file(str(tmp_path / "in.csv"), str(tmp_path / output), chunk_size=4, on_error="mark")
+
+    assert n == 6
+    result = pd.read_csv(tmp_path / output) if output.endswith(".csv") else pd.read_parquet(tmp_path / output)
+    assert result["valid"].tolist() == [True, True, True, True, False, True]
+    assert result["cost"].isna().tolist() == [False, False, False, False, True, False]
+
+
+def test_invalid_row_raises(tmp_path):
+    write_designs(tmp_path / "in.csv", [8, 8, 8, 8, "abc", 7.6])
+
+    with pytest.raises(ValueError, match="row\\(s\\) 4"):
+        evaluate_file(str(tmp_path / "in.csv"), str(tmp_path / "out.csv"), chunk_size=4)
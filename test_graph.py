@@ -0,0 +1,50 @@
+import numpy as np
+
+from graph import JACK_OUTPUTS, evaluate_catalog, jack_graph
+from model import evaluate, material_names
+
+DESIGN = (8.0, 1.5, 1.5, 0.45, 0.6, 0.76, 6.0)  # model() arguments before material
+
+
+def test_catalog_matches_evaluate():
+    outputs = evaluate_catalog(*DESIGN, force=2500)
+
+    for i, material in enumerate(material_names):
+        expected = evaluate(*DESIGN, material, force=2500)
+        assert [outputs[name][i] for name in JACK_OUTPUTS] == list(expected)
+
+
+def test_material_change_keeps_geometry_nodes():
+    graph = jack_graph()
+    evaluate_catalog(*DESIGN, materials=material_names[:2], graph=graph)
+    calls = dict(graph.calls)
+
+    evaluate_catalog(*DESIGN, materials=material_names[2:], graph=graph)
+
+    changed = {name for name in calls if graph.calls[name] != calls[name]}
+    assert changed == {
+        "E",
+        "S_y",
+        "density",
+        "cost_per_lb",
+        "n_buckling",
+        "n_tearout",
+        "n_bearing",
+        "n_axial",
+        "mass_d",
+        "weight",
+        "cost",
+    }
+
+
+def test_load_change_keeps_section_nodes():
+    graph = jack_graph()
+    evaluate_catalog(*DESIGN, graph=graph)
+    calls = dict(graph.calls)
+
+    outputs = evaluate_catalog(*DESIGN, force=4000, graph=graph)
+
+    for name in ("length_pins", "start_angle", "min_I", "volume_d", "mass_cb", "E", "S_y", "cost"):
+        assert graph.calls[name] == calls[name]
+    assert graph.calls["n_buckling"] == calls["n_buckling"] + 1
+    assert (outputs["n_tensile"] == evaluate(*DESIGN, material_names[0], force=4000)[1]).all()
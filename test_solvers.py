@@ -0,0 +1,33 @@
+from solvers import DEFAULT_SOLVER, pick_fastest_reliable
+
+
+def record(backend, case, cost, feasible=True, wall_time=1.0):
+    return {"backend": backend, "case": case, "cost": cost, "feasible": feasible, "wall_time": wall_time}
+
+
+def test_fastest_reliable_wins():
+    records = [
+        record("SLSQP", "a", 10.0, wall_time=1.0),
+        record("shgo", "a", 10.05, wall_time=5.0),
+        record("trust-constr", "a", 12.0, wall_time=0.5),  # too expensive
+        record("COBYQA", "a", 10.0, feasible=False, wall_time=0.1),
+    ]
+
+    assert pick_fastest_reliable(records) == "SLSQP"
+
+
+def test_unsolved_case_is_ignored():
+    records = [
+        record("SLSQP", "a", 10.0, wall_time=2.0),
+        record("shgo", "a", 10.0, wall_time=1.0),
+        record("SLSQP", "b", float("inf"), feasible=False),
+        record("shgo", "b", float("inf"), feasible=False),
+    ]
+
+    assert pick_fastest_reliable(records) == "shgo"
+
+
+def test_nothing_solved_falls_back_to_default():
+    records = [record("SLSQP", "a", float("inf"), feasible=False)]
+
+    assert pick_fastest_reliable(records) == DEFAULT_SOLVER
@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+
+from storage import OUTPUT_COLUMNS, QUANTIZE_RANGES, create_store, open_store
+
+
+def write_rows(store, start, cost, feasible):
+    n = len(cost)
+    values = {name: np.ones(n) for name in store.columns}
+    values["cost"] = np.asarray(cost, dtype=float)
+    store.write(start, values, np.zeros(n, dtype=int), feasible)
+
+
+@pytest.mark.parametrize("dtype", ["float64", "float32", "uint16"])
+def test_encode_decode(tmp_path, dtype):
+    store = create_store(str(tmp_path), 8, dtype=dtype, columns=("cost",))
+    cost = [0, 0.5, 12.25, 999.9, 1000, np.nan, 3, 4]
+
+    write_rows(store, 0, cost, np.ones(8, dtype=bool))
+
+    # one uint16 step is (high - low) / 65532, about 0.015 $ for cost
+    step = QUANTIZE_RANGES["cost"][1] / 65532
+    assert np.allclose(open_store(str(tmp_path)).column("cost"), cost, atol=step, equal_nan=True)
+
+
+def test_out_of_range_uint16(tmp_path):
+    store = create_store(str(tmp_path), 8, dtype="uint16", columns=("cost",))
+
+    write_rows(store, 0, [500, 2600, 3000, -1, np.nan, 10, 20, 30], np.ones(8, dtype=bool))
+
+    cost = store.column("cost")
+    assert cost[0] == pytest.approx(500, abs=0.02)
+    assert cost[1:4].tolist() == [np.inf, np.inf, -np.inf]
+    assert np.isnan(cost[4])
+    assert store.where(max_cost=1500).tolist() == [0, 3, 5, 6, 7]
+
+
+def test_feasible_bitmap_offset(tmp_path):
+    store = create_store(str(tmp_path), 20, columns=OUTPUT_COLUMNS)
+    feasible = np.arange(20) % 3 == 0
+
+    write_rows(store, 0, np.arange(8), feasible[:8])
+    write_rows(store, 8, np.arange(8, 20), feasible[8:])
+
+    assert store.feasible(3, 17).tolist() == feasible[3:17].tolist()
+    assert store.where().tolist() == np.where(feasible)[0].tolist()
+    assert store.where(max_cost=10, chunk_size=8).tolist() == [0, 3, 6, 9]
+    with pytest.raises(ValueError, match="multiple of 8"):
+        write_rows(store, 4, [1], [True])